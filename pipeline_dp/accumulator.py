@@ -256,6 +256,7 @@ class SumAccumulator(Accumulator):
                         accumulator: 'SumAccumulator') -> 'SumAccumulator':
         self._check_mergeable(accumulator)
         self._sum += accumulator._sum
+        return self
 
     def compute_metrics(self) -> float:
         return pipeline_dp.dp_computations.compute_dp_sum(
@@ -1,21 +1,19 @@
 """Adapters for working with pipeline frameworks."""
 
-from enum import Enum
-from functools import partial
-import os
+from functools import partial, reduce
+import operator
 import multiprocessing as mp
-from pipeline_dp import accumulator
+import multiprocessing.pool
 import random
-import numpy as np
 
 import abc
 import apache_beam as beam
+import cloudpickle
 import apache_beam.transforms.combiners as combiners
 import collections
+import numpy as np
 import pipeline_dp.accumulator as accumulator
 import typing
-from typing import Any, Optional, Callable, Tuple
-import collections
 import itertools
 
 
@@ -93,6 +91,39 @@ class PipelineOperations(abc.ABC):
         pass
 
 
+class _MergeAccumulatorsCombineFn(beam.CombineFn):
+    """Combines accumulators per key with map-side partial merging.
+
+    Exposing the merge as a CombineFn (rather than a callable taking the full
+    iterable of accumulators per key) lets Beam pre-combine accumulators on
+    the map side before the shuffle.
+    """
+
+    def create_accumulator(self):
+        return None
+
+    def add_input(self, merged, accumulator):
+        if merged is None:
+            return accumulator
+        merged.add_accumulator(accumulator)
+        return merged
+
+    def merge_accumulators(self, accumulators):
+
+        def merge(merged, accumulator):
+            if merged is None:
+                return accumulator
+            if accumulator is None:
+                return merged
+            merged.add_accumulator(accumulator)
+            return merged
+
+        return reduce(merge, accumulators, None)
+
+    def extract_output(self, merged):
+        return merged
+
+
 class BeamOperations(PipelineOperations):
     """Apache Beam adapter."""
 
@@ -127,27 +158,9 @@ class BeamOperations(PipelineOperations):
     def filter_by_key(self, col, keys_to_keep, data_extractors,
                       stage_name: str):
 
-        class PartitionsFilterJoin(beam.DoFn):
-
-            def process(self, joined_data):
-                key, rest = joined_data
-                values, is_public = rest.get(VALUES), rest.get(IS_PUBLIC)
-
-                # TODO the Issue #4 says this is blocked on other tasks. Revisit
-                # this once unblocked
-                if not values:
-                    return
-
-                if is_public:
-                    for value in values:
-                        yield key, value
-
         def has_public_partition_key(pk_val):
             return pk_val[0] in keys_to_keep
 
-        # define constants for using as keys in CoGroupByKey
-        VALUES, IS_PUBLIC = 0, 1
-
         if keys_to_keep is None:
             raise TypeError("Must provide a valid keys to keep")
 
@@ -161,15 +174,13 @@ class BeamOperations(PipelineOperations):
             return col | "Filtering data from public partitions" >> beam.Filter(
                 has_public_partition_key)
 
-        # Public paritions are not in memory. Filter out with a join.
-        keys_to_keep = (keys_to_keep | "Creating public_partitions PCollection"
-                        >> beam.Map(lambda x: (x, True)))
-        return ({
-            VALUES: col,
-            IS_PUBLIC: keys_to_keep
-        } | "Aggregating elements by values and is_public partition flag " >>
-                beam.CoGroupByKey() | "Filtering data from public partitions" >>
-                beam.ParDo(PartitionsFilterJoin()))
+        # Public partitions are not in memory. Pass them to workers as a set
+        # side input and filter map-side, which avoids shuffling the whole
+        # input collection through a CoGroupByKey.
+        keys_to_keep = beam.pvalue.AsSingleton(
+            keys_to_keep | "Creating keys to keep set" >> combiners.ToSet())
+        return col | "Filtering data from public partitions" >> beam.Filter(
+            lambda pk_val, keys: pk_val[0] in keys, keys=keys_to_keep)
 
     def keys(self, col, stage_name: str):
         return col | stage_name >> beam.Keys()
@@ -184,17 +195,13 @@ class BeamOperations(PipelineOperations):
         return col | stage_name >> combiners.Count.PerElement()
 
     def reduce_accumulators_per_key(self, col, stage_name: str = None):
-        # TODO: Use merge function from the accumulator framework.
-        def merge_accumulators(accumulators):
-            res = None
-            for acc in accumulators:
-                if res:
-                    res.add_accumulator(acc)
-                else:
-                    res = acc
-            return res
+        return col | stage_name >> beam.CombinePerKey(
+            _MergeAccumulatorsCombineFn())
 
-        return col | stage_name >> beam.CombinePerKey(merge_accumulators)
+
+# Distributed key sets up to this size are collected and broadcast for
+# map-side filtering instead of joined.
+_MAX_KEYS_TO_BROADCAST = 100000
 
 
 class SparkRDDOperations(PipelineOperations):
@@ -246,9 +253,23 @@ class SparkRDDOperations(PipelineOperations):
                 keys_to_keep = set(keys_to_keep)
             return rdd.filter(lambda x: x[0] in keys_to_keep)
 
-        else:
-            filtering_rdd = keys_to_keep.map(lambda x: (x, None))
-            return rdd.join(filtering_rdd).map(lambda x: (x[0], x[1][0]))
+        keys_to_keep = keys_to_keep.cache()
+        if keys_to_keep.count() <= _MAX_KEYS_TO_BROADCAST:
+            # The key set is small: broadcast it and filter map-side,
+            # avoiding the shuffle entirely.
+            broadcast_keys = rdd.context.broadcast(set(keys_to_keep.collect()))
+            return rdd.filter(lambda x: x[0] in broadcast_keys.value)
+
+        # The key set is too large to broadcast. A plain join would pile all
+        # rows of a heavy-hitter partition key onto a single reducer, so salt
+        # the left side with a random bucket and replicate the key set over
+        # all buckets.
+        num_salts = rdd.context.defaultParallelism
+        salted_rdd = rdd.map(lambda x:
+                             ((x[0], random.randrange(num_salts)), x[1]))
+        salted_keys = keys_to_keep.flatMap(
+            lambda key: [((key, salt), None) for salt in range(num_salts)])
+        return salted_rdd.join(salted_keys).map(lambda x: (x[0][0], x[1][0]))
 
     def keys(self, rdd, stage_name: str = None):
         return rdd.keys()
@@ -269,14 +290,39 @@ class SparkRDDOperations(PipelineOperations):
           An RDD of tuples.
 
         """
-        return rdd.mapValues(lambda x: [x]).reduceByKey(
-            lambda x, y: random.sample(x + y, min(len(x) + len(y), n)))
+
+        def add_to_reservoir(reservoir, value):
+            samples, seen = reservoir
+            if len(samples) < n:
+                samples.append(value)
+            else:
+                # Reservoir sampling (Algorithm R): replace a random sample
+                # with decreasing probability so the buffer stays uniform.
+                index = random.randrange(seen + 1)
+                if index < n:
+                    samples[index] = value
+            return samples, seen + 1
+
+        def merge_reservoirs(reservoir1, reservoir2):
+            samples = reservoir1[0] + reservoir2[0]
+            if len(samples) > n:
+                samples = random.sample(samples, n)
+            return samples, reservoir1[1] + reservoir2[1]
+
+        return rdd.aggregateByKey(
+            ([], 0), add_to_reservoir,
+            merge_reservoirs).mapValues(lambda reservoir: reservoir[0])
 
     def count_per_element(self, rdd, stage_name: str = None):
-        return rdd.map(lambda x: (x, 1)).reduceByKey(lambda x, y: (x + y))
+        return rdd.map(lambda x: (x, 1)).reduceByKey(operator.add)
 
     def reduce_accumulators_per_key(self, rdd, stage_name: str = None):
-        return rdd.reduceByKey(lambda acc1, acc2: acc1.add_accumulator(acc2))
+
+        def merge_accumulators(acc1, acc2):
+            acc1.add_accumulator(acc2)
+            return acc1
+
+        return rdd.reduceByKey(merge_accumulators)
 
 
 class LocalPipelineOperations(PipelineOperations):
@@ -289,7 +335,7 @@ class LocalPipelineOperations(PipelineOperations):
         return (x for el in col for x in fn(el))
 
     def map_tuple(self, col, fn, stage_name: str = None):
-        return map(lambda x: fn(*x), col)
+        return itertools.starmap(fn, col)
 
     def map_values(self, col, fn, stage_name: typing.Optional[str] = None):
         return ((k, fn(v)) for k, v in col)
@@ -300,8 +346,10 @@ class LocalPipelineOperations(PipelineOperations):
             d = collections.defaultdict(list)
             for key, value in col:
                 d[key].append(value)
-            for item in d.items():
-                yield item
+            # Pop groups as they are yielded so the memory of already
+            # consumed groups is released while downstream stages run.
+            for key in list(d):
+                yield key, d.pop(key)
 
         return group_by_key_generator()
 
@@ -315,15 +363,16 @@ class LocalPipelineOperations(PipelineOperations):
         data_extractors,
         stage_name: typing.Optional[str] = None,
     ):
-        return [(data_extractors.partition_extractor(x), x)
-                for x in col
-                if data_extractors.partition_extractor(x) in keys_to_keep]
+        if not isinstance(keys_to_keep, (set, frozenset)):
+            keys_to_keep = set(keys_to_keep)
+        keyed_col = ((data_extractors.partition_extractor(x), x) for x in col)
+        return [(key, x) for key, x in keyed_col if key in keys_to_keep]
 
     def keys(self, col, stage_name: typing.Optional[str] = None):
-        return (k for k, v in col)
+        return map(operator.itemgetter(0), col)
 
     def values(self, col, stage_name: typing.Optional[str] = None):
-        return (v for k, v in col)
+        return map(operator.itemgetter(1), col)
 
     def sample_fixed_per_key(self,
                              col,
@@ -335,33 +384,89 @@ class LocalPipelineOperations(PipelineOperations):
                 key = item[0]
                 values = item[1]
                 if len(values) > n:
-                    sampled_indices = np.random.choice(range(len(values)),
-                                                       n,
-                                                       replace=False)
-                    values = [values[i] for i in sampled_indices]
+                    values = random.sample(values, n)
                 yield key, values
 
         return sample_fixed_per_key_generator()
 
     def count_per_element(self, col, stage_name: typing.Optional[str] = None):
+        if isinstance(col, np.ndarray):
+            # Counting through np.unique stays in C instead of hashing
+            # element by element.
+            values, counts = np.unique(col, return_counts=True)
+            yield from zip(values.tolist(), counts.tolist())
+            return
         yield from collections.Counter(col).items()
 
     def reduce_accumulators_per_key(self, col, stage_name: str = None):
         return self.map_values(self.group_by_key(col), accumulator.merge)
 
 
-# workaround for passing lambda functions to multiprocessing
-# according to https://medium.com/@yasufumy/python-multiprocessing-c6d54107dd55
-_pool_current_func = None
+# Number of rows handed to a worker in one task when the computation is
+# dispatched in chunks.
+_ROWS_PER_TASK = 1000
+
+
+def _chunks_of(iterable, chunk_size: int):
+    """Yields successive lists of at most chunk_size elements."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _group_chunk_by_key(chunk):
+    """Groups a chunk of (key, value) rows into a dict of lists."""
+    groups = collections.defaultdict(list)
+    for key, value in chunk:
+        groups[key].append(value)
+    return groups
+
 
+# Per-worker cache of deserialized jobs, keyed by the serialized payload, so
+# that a job is unpickled once per worker instead of once per task. A
+# pipeline runs a handful of distinct jobs, so the cache stays small.
+_worker_job_cache = {}
 
-def _pool_worker_init(func):
-    global _pool_current_func
-    _pool_current_func = func
 
+def _deserialized_job(job_payload: bytes):
+    job = _worker_job_cache.get(job_payload)
+    if job is None:
+        job = _worker_job_cache[job_payload] = cloudpickle.loads(job_payload)
+    return job
 
-def _pool_worker(row):
-    return _pool_current_func(row)
+
+def _run_chunk_job(task):
+    """Applies a cloudpickle-serialized job to a whole chunk of rows."""
+    job_payload, chunk = task
+    return _deserialized_job(job_payload)(chunk)
+
+
+def _run_row_job_on_chunk(task):
+    """Applies a cloudpickle-serialized per-row job to each row of a chunk."""
+    job_payload, chunk = task
+    job = _deserialized_job(job_payload)
+    return [job(row) for row in chunk]
+
+
+_shared_pools = {}
+
+
+def _shared_pool(n_jobs: typing.Optional[int], pool_kwargs) -> mp.pool.Pool:
+    """Returns a process-wide Pool, creating it on first use.
+
+    Pools are keyed by their construction arguments, so iterators with the
+    same configuration reuse the same workers instead of forking a fresh
+    pool per pipeline stage.
+    """
+    key = (n_jobs, tuple(sorted(pool_kwargs.items())))
+    pool = _shared_pools.get(key)
+    if pool is None:
+        pool = mp.Pool(n_jobs, **pool_kwargs)
+        _shared_pools[key] = pool
+    return pool
 
 
 class _LazyMultiProcIterator:
@@ -389,18 +494,39 @@ class _LazyMultiProcIterator:
         self._pool = None
 
     def _init_pool(self):
-        """Creates the multiprocessing.Pool object that will manage the distributed computation."""
-        self._pool = mp.Pool(self.n_jobs,
-                             initializer=_pool_worker_init,
-                             initargs=(self.job,),
-                             **self.pool_kwargs)
+        """Fetches the shared multiprocessing.Pool object that will manage the distributed computation."""
+        self._pool = _shared_pool(self.n_jobs, self.pool_kwargs)
         return self._pool
 
+    def _job_tasks(self):
+        """Returns the list of (serialized job, chunk) tasks for the pool workers.
+
+        The job is shipped with every task (serialized with cloudpickle so
+        lambdas and closures survive the queue) rather than bound at pool
+        creation time, which is what allows the pool to be shared between
+        iterators running different jobs.
+
+        The task list is materialized here, in the consuming thread, on
+        purpose: the pool's task handler thread iterates whatever iterable
+        is handed to imap, and if that iteration pulls from a nested lazy
+        iterator it blocks the handler thread on results it is itself
+        responsible for dispatching, deadlocking any chain of multiproc
+        stages.
+        """
+        job_payload = cloudpickle.dumps(self.job)
+        return [(job_payload, chunk)
+                for chunk in _chunks_of(self.job_inputs, _ROWS_PER_TASK)]
+
     def _trigger_iterations(self):
         """Trigger the Pool operation that iterates over inputs and produces outputs."""
         if self._outputs is None:
-            self._outputs = self._init_pool().map(_pool_worker, self.job_inputs,
-                                                  self.chunksize)
+            # imap keeps the input order but yields chunk results as they
+            # complete, so consumers start receiving outputs before the
+            # whole input has been processed.
+            chunk_outputs = self._init_pool().imap(_run_row_job_on_chunk,
+                                                   self._job_tasks(),
+                                                   self.chunksize)
+            self._outputs = itertools.chain.from_iterable(chunk_outputs)
 
     def __iter__(self):
         if isinstance(self.job_inputs, _LazyMultiProcIterator):
@@ -414,22 +540,13 @@ class _LazyMultiProcGroupByIterator(_LazyMultiProcIterator):
     def __init__(self, job_inputs: typing.Iterable, chunksize: int,
                  n_jobs: typing.Optional[int], **pool_kwargs):
         """Utilizes mp.Pool for distributed group by computation.
-        The results are held in a `mp.Manager.dict[KeyType, np.Manager.list[ValueType]]`.
 
-        The `mp.Manager.{dict, list}` objects are managed by the `manager` to allow multiprocess-safe
-        access to the containers.
+        Each worker groups a chunk of rows into a local dict and the partial
+        dicts are merged in the parent process. This keeps all writes local
+        to a process instead of paying a serialized round trip through a
+        `mp.Manager` proxy for every row.
         """
-        self.manager = mp.Manager()
-        self.results_dict = self.manager.dict()
-
-        def insert_row(captures, row):
-            (results_dict_,) = captures
-            key, val = row
-            results_dict_[key].append(val)
-
-        insert_row = partial(insert_row, (self.results_dict,))
-
-        super().__init__(insert_row,
+        super().__init__(_group_chunk_by_key,
                          job_inputs,
                          chunksize=chunksize,
                          n_jobs=n_jobs,
@@ -437,32 +554,28 @@ class _LazyMultiProcGroupByIterator(_LazyMultiProcIterator):
 
     def _trigger_iterations(self):
         if self._outputs is None:
-            keys = set(k for k, v in self.job_inputs)
-            self.results_dict.update({k: self.manager.list() for k in keys})
-            self._init_pool().map(_pool_worker, self.job_inputs, self.chunksize)
-            self._outputs = ((k, list(v)) for k, v in self.results_dict.items())
+            partial_groups = self._init_pool().map(_run_chunk_job,
+                                                   self._job_tasks(),
+                                                   self.chunksize)
+            groups = collections.defaultdict(list)
+            for partial_group in partial_groups:
+                for key, values in partial_group.items():
+                    groups[key].extend(values)
+            self._outputs = ((key, groups.pop(key)) for key in list(groups))
 
 
 class _LazyMultiProcCountIterator(_LazyMultiProcIterator):
 
     def __init__(self, job_inputs: typing.Iterable, chunksize: int,
                  n_jobs: typing.Optional[int], **pool_kwargs):
-        """Utilizes mp.Pool for distributed group by computation.
-        The results are held in a `mp.Manager.dict[KeyType, int]`.
+        """Utilizes mp.Pool for distributed count computation.
 
-        The `mp.Manager.dict` object is managed by the `manager` to allow multiprocess-safe
-        access to the container.
+        Each worker counts a chunk of elements with a local
+        `collections.Counter` and the partial counters are summed in the
+        parent process, instead of incrementing a `mp.Manager` proxy dict
+        entry per element.
         """
-        self.manager = mp.Manager()
-        self.results_dict = self.manager.dict()
-
-        def insert_row(captures, key):
-            (results_dict_,) = captures
-            results_dict_[key] += 1
-
-        insert_row = partial(insert_row, (self.results_dict,))
-
-        super().__init__(insert_row,
+        super().__init__(collections.Counter,
                          job_inputs,
                          chunksize=chunksize,
                          n_jobs=n_jobs,
@@ -470,10 +583,22 @@ class _LazyMultiProcCountIterator(_LazyMultiProcIterator):
 
     def _trigger_iterations(self):
         if self._outputs is None:
-            keys = set(self.job_inputs)
-            self.results_dict.update({k: 0 for k in keys})
-            self._init_pool().map(_pool_worker, self.job_inputs, self.chunksize)
-            self._outputs = self.results_dict.items()
+            partial_counts = self._init_pool().map(_run_chunk_job,
+                                                   self._job_tasks(),
+                                                   self.chunksize)
+            counts = collections.Counter()
+            for partial_count in partial_counts:
+                counts.update(partial_count)
+            self._outputs = iter(counts.items())
+
+
+def _apply_to_tuple_args(fn, row):
+    return fn(*row)
+
+
+def _apply_to_value(fn, row):
+    key, value = row
+    return key, fn(value)
 
 
 class MultiProcLocalPipelineOperations(PipelineOperations):
@@ -497,18 +622,24 @@ class MultiProcLocalPipelineOperations(PipelineOperations):
         return (e for x in self.map(col, fn, stage_name) for e in x)
 
     def map_tuple(self, col, fn, stage_name: typing.Optional[str] = None):
-        return self.map(col, lambda row: fn(*row), stage_name)
+        return self.map(col, partial(_apply_to_tuple_args, fn), stage_name)
 
     def map_values(self, col, fn, stage_name: typing.Optional[str] = None):
-        return self.map(col, lambda x: (x[0], fn(x[1])), stage_name)
+        return self.map(col, partial(_apply_to_value, fn), stage_name)
 
     def group_by_key(self, col, stage_name: typing.Optional[str] = None):
         return _LazyMultiProcGroupByIterator(col, self.chunksize, self.n_jobs,
                                              **self.pool_kwargs)
 
     def filter(self, col, fn, stage_name: typing.Optional[str] = None):
-        ordered_predicates = self.map(col, fn, stage_name)
-        return (row for row, keep in zip(col, ordered_predicates) if keep)
+
+        def mapped_fn(captures, row):
+            (fn_,) = captures
+            return row, fn_(row)
+
+        mapped_fn = partial(mapped_fn, (fn,))
+        ordered_row_keep = self.map(col, mapped_fn, stage_name)
+        return (row for row, keep in ordered_row_keep if keep)
 
     def filter_by_key(self,
                       col,
@@ -519,21 +650,33 @@ class MultiProcLocalPipelineOperations(PipelineOperations):
         def mapped_fn(captures, row):
             keys_to_keep_, data_extractors_ = captures
             key = data_extractors_.partition_extractor(row)
-            return key, (key in keys_to_keep_)
+            return key, row, (key in keys_to_keep_)
 
         mapped_fn = partial(mapped_fn, (keys_to_keep, data_extractors))
         ordered_key_keep = self.map(col, mapped_fn, stage_name)
-        return ((key, row)
-                for row, (key, keep) in zip(col, ordered_key_keep)
-                if keep)
+        return ((key, row) for key, row, keep in ordered_key_keep if keep)
 
     def keys(self, col, stage_name: typing.Optional[str] = None):
         # no point in passing through multiproc.
-        return (k for k, v in col)
+        if isinstance(col, np.ndarray):
+            # Column extraction is a vectorized slice (a view, no copy).
+            if col.dtype.names:
+                return col[col.dtype.names[0]]
+            if col.ndim == 2:
+                return col[:, 0]
+            # 1-D arrays (e.g. object arrays of tuples) take the row path.
+        return map(operator.itemgetter(0), col)
 
     def values(self, col, stage_name: typing.Optional[str] = None):
         # no point in passing through multiproc.
-        return (v for k, v in col)
+        if isinstance(col, np.ndarray):
+            # Column extraction is a vectorized slice (a view, no copy).
+            if col.dtype.names:
+                return col[col.dtype.names[1]]
+            if col.ndim == 2:
+                return col[:, 1]
+            # 1-D arrays (e.g. object arrays of tuples) take the row path.
+        return map(operator.itemgetter(1), col)
 
     def sample_fixed_per_key(self,
                              col,
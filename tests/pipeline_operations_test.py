@@ -1,8 +1,11 @@
 import unittest
+from unittest.mock import patch
+
 import pyspark
 
 from absl.testing import parameterized
 import apache_beam as beam
+import numpy as np
 import apache_beam.testing.test_pipeline as test_pipeline
 from apache_beam.testing.util import assert_that
 from apache_beam.testing.util import equal_to
@@ -139,6 +142,17 @@ class SparkRDDOperationsTest(parameterized.TestCase):
             SparkRDDOperationsTest.data_extractors).collect()
         self.assertListEqual(result, [(11, (1, 11, 111))])
 
+    @patch('pipeline_dp.pipeline_operations._MAX_KEYS_TO_BROADCAST', 0)
+    def test_filter_by_key_salted_join(self):
+        spark_operations = SparkRDDOperations()
+        data = [(1, 11, 111), (2, 22, 222)]
+        dist_data = SparkRDDOperationsTest.sc.parallelize(data)
+        public_partitions = SparkRDDOperationsTest.sc.parallelize([11, 33])
+        result = spark_operations.filter_by_key(
+            dist_data, public_partitions,
+            SparkRDDOperationsTest.data_extractors).collect()
+        self.assertListEqual(result, [(11, (1, 11, 111))])
+
     def test_sample_fixed_per_key(self):
         spark_operations = SparkRDDOperations()
         data = [(1, 11), (2, 22), (3, 33), (1, 14), (2, 25), (1, 16)]
@@ -303,6 +317,13 @@ class LocalPipelineOperationsTest(unittest.TestCase):
             0: 1
         })
 
+    def test_local_count_per_element_numpy(self):
+        example_list = [1, 2, 3, 4, 5, 6, 1, 4, 0, 1]
+        result = self.ops.count_per_element(np.array(example_list))
+
+        self.assertEqual(dict(result),
+                         dict(self.ops.count_per_element(example_list)))
+
     def test_local_reduce_accumulators_per_key(self):
         example_list = [(1, 2), (2, 1), (1, 4), (3, 8), (2, 3)]
         col = self.ops.map_values(example_list, SumAccumulator)
@@ -539,6 +560,29 @@ class MultiProcLocalPipelineOperationsTest(unittest.TestCase):
         self.assertDatasetsEqual(list(self.ops.values(example_list)),
                                  [2, 3, 4, 8])
 
+    @pytest.mark.timeout(10)
+    def test_multiproc_keys_values_numpy_2d(self):
+        col = np.array([(1, 2), (3, 4)])
+
+        self.assertEqual(list(self.ops.keys(col)), [1, 3])
+        self.assertEqual(list(self.ops.values(col)), [2, 4])
+
+    @pytest.mark.timeout(10)
+    def test_multiproc_keys_values_numpy_structured(self):
+        col = np.array([(1, 2.5), (3, 4.5)],
+                       dtype=[('key', 'i4'), ('value', 'f4')])
+
+        self.assertEqual(list(self.ops.keys(col)), [1, 3])
+        self.assertEqual(list(self.ops.values(col)), [2.5, 4.5])
+
+    @pytest.mark.timeout(10)
+    def test_multiproc_keys_values_numpy_1d_fallback(self):
+        col = np.empty(2, dtype=object)
+        col[:] = [(1, 2), (3, 4)]
+
+        self.assertEqual(list(self.ops.keys(col)), [1, 3])
+        self.assertEqual(list(self.ops.values(col)), [2, 4])
+
     @pytest.mark.timeout(10)
     def test_multiproc_count_per_element(self):
         example_list = [1, 2, 3, 4, 5, 6, 1, 4, 0, 1]
@@ -575,6 +619,21 @@ class MultiProcLocalPipelineOperationsTest(unittest.TestCase):
                 map(lambda pid_pk_v: len(pid_pk_v[1]) <= n,
                     sample_fixed_per_key_result)))
 
+    @pytest.mark.timeout(10)
+    def test_multiproc_chained_maps(self):
+        col = [1, 2, 3, 4]
+        result = self.ops.map(
+            self.ops.map(self.ops.map(col, lambda x: x + 1), lambda x: 2 * x),
+            lambda x: x - 1)
+        self.assertDatasetsEqual(list(result), [3, 5, 7, 9])
+
+    @pytest.mark.timeout(10)
+    def test_multiproc_map_over_filter(self):
+        col = [1, 2, 3, 4]
+        result = self.ops.map(self.ops.filter(col, lambda x: x % 2 == 0),
+                              lambda x: x * 10)
+        self.assertDatasetsEqual(list(result), [20, 40])
+
     @pytest.mark.timeout(10)
     def test_multiproc_flat_map(self):
         input_col = [[1, 2, 3, 4], [5, 6, 7, 8]]